@@ -1,6 +1,13 @@
+import fcntl
+import json
 import pytest
 import subprocess
 from enum import Enum
+from pathlib import Path
+from tests.helpers import DIRS, walk, write_tar
+
+
+ROOT = Path(__file__).resolve().parent.parent
 
 
 class RunMode(Enum):
@@ -8,13 +15,80 @@ class RunMode(Enum):
     RELEASE = ("--release",)
 
 
-@pytest.fixture(params=(RunMode.DEBUG, RunMode.RELEASE))
-def cargo_run(request):
-    def run(args):
+def cargo_target_dir():
+    """Target dir as cargo sees it (CARGO_TARGET_DIR, .cargo/config...)."""
+    metadata = subprocess.run(
+        ["cargo", "metadata", "--no-deps", "--format-version", "1"],
+        check=True,
+        capture_output=True,
+        cwd=str(ROOT),
+    ).stdout
+    return Path(json.loads(metadata)["target_directory"])
+
+
+def cargo_build(mode):
+    """Build splitar and return the path of the executable cargo reports."""
+    messages = subprocess.run(
+        ["cargo", "build", "--quiet", "--message-format=json-render-diagnostics"]
+        + list(mode.value),
+        check=True,
+        stdout=subprocess.PIPE,
+        cwd=str(ROOT),
+    ).stdout
+    for line in messages.splitlines():
+        msg = json.loads(line)
+        if (
+            msg.get("reason") == "compiler-artifact"
+            and msg["target"]["name"] == "splitar"
+            and msg.get("executable")
+        ):
+            return Path(msg["executable"])
+    raise RuntimeError("cargo build did not report the splitar executable")
+
+
+@pytest.fixture(scope="session")
+def splitar_bins():
+    """Build splitar in all the modes at once; map each mode to its binary."""
+    target = cargo_target_dir()
+    target.mkdir(parents=True, exist_ok=True)
+    # pytest-xdist workers each run session fixtures; serialize the builds.
+    with open(str(target / ".splitar-build.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return {mode: cargo_build(mode) for mode in RunMode}
+
+
+@pytest.fixture(scope="session", params=(RunMode.DEBUG, RunMode.RELEASE))
+def splitar_bin(request, splitar_bins):
+    return splitar_bins[request.param]
+
+
+@pytest.fixture
+def cargo_run(splitar_bin):
+    def run(args, capture=False):
+        # close_fds=False with an absolute executable path lets subprocess
+        # use posix_spawn(3) instead of fork+exec; our own pipes are
+        # non-inheritable anyway.
+        if capture:
+            output = dict(capture_output=True)
+        else:
+            # stderr goes to pytest's fd capture and is shown on failure.
+            output = dict(stdout=subprocess.DEVNULL)
         return subprocess.run(
-            ["cargo", "run", "--quiet"] + list(request.param.value) + ["--"] + args,
+            [str(splitar_bin)] + args,
             check=True,
-            capture_output=True,
+            close_fds=False,
+            **output,
         )
 
     return run
+
+
+@pytest.fixture(scope="session")
+def shared_dir(tmp_path_factory):
+    """Inputs are deterministic, so they are built once per session here."""
+    return tmp_path_factory.mktemp("shared")
+
+
+@pytest.fixture(scope="session")
+def dirs_tar_file(shared_dir):
+    return write_tar(shared_dir / "dirs.tar", walk(DIRS))
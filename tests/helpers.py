@@ -0,0 +1,129 @@
+"""
+Helpers shared by the Python tests.
+"""
+import io
+import os
+import tarfile
+
+
+class RepeatReader(io.RawIOBase):
+    """A file-like of `size` bytes repeating `pattern`, without holding
+    the whole payload in memory."""
+
+    _CHUNK_SIZE = 65536
+
+    def __init__(self, pattern, size):
+        self.pattern = pattern
+        self.remaining = size
+        self.pos = 0
+        self.chunk = pattern * (self._CHUNK_SIZE // len(pattern) + 1)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        k = min(len(b), self.remaining, self._CHUNK_SIZE)
+        start = self.pos % len(self.pattern)
+        b[:k] = self.chunk[start : start + k]
+        self.pos += k
+        self.remaining -= k
+        return k
+
+
+def materialize(src, dst):
+    """Make a per-test copy of a shared input file.
+
+    splitar never writes its input, so a hardlink is enough; fall back to
+    an in-kernel sendfile copy when linking is not possible.
+    """
+    try:
+        os.link(str(src), str(dst))
+        return
+    except OSError:
+        pass
+    with open(str(src), "rb") as s, open(str(dst), "wb") as d:
+        size = os.fstat(s.fileno()).st_size
+        offset = 0
+        while offset < size:
+            offset += os.sendfile(d.fileno(), s.fileno(), offset, size - offset)
+
+
+def write_tar(path, entries):
+    """Write (TarInfo, fileobj) pairs into a new tar archive at `path`."""
+    with tarfile.open(str(path), mode="w") as tar:
+        for ti, data in entries:
+            tar.addfile(ti, data)
+    return path
+
+
+def input_tar(tmpdir, src):
+    """Give a test its own `input.tar` copy of a shared archive."""
+    inp = tmpdir.join("input.tar")
+    materialize(src, inp)
+    return inp
+
+
+def ls(path):
+    """Sorted entry names of a directory."""
+    with os.scandir(str(path)) as it:
+        return sorted(entry.name for entry in it)
+
+
+def walk(root):
+    """Yield (TarInfo, fileobj) pairs of the tree in depth-first order."""
+    stack = [("", root)]
+    while stack:
+        parent_path, node = stack.pop()
+        path = parent_path + node.name
+        yield node.to_tar_entry(path)
+        stack.extend((path + "/", child) for child in reversed(node.children))
+
+
+class Dir:
+    def __init__(self, name, children):
+        self.name = name
+        self.children = children
+
+    def to_tar_entry(self, path):
+        ti = tarfile.TarInfo(path + "/")
+        ti.type = tarfile.DIRTYPE
+        return ti, None
+
+
+class File:
+    children = ()
+
+    def __init__(self, name, size):
+        self.name = name
+        self.size = size
+
+    def to_tar_entry(self, path):
+        ti = tarfile.TarInfo(path)
+        ti.type = tarfile.REGTYPE
+        ti.size = self.size
+        return ti, RepeatReader(b"0", self.size)
+
+
+DIRS = Dir(
+    "thedir",
+    [
+        Dir(
+            "nested1",
+            [
+                File("file1", 10240),
+                Dir("somedir", []),
+                File("file2", 10240),
+            ],
+        ),
+        Dir(
+            "nested2",
+            [
+                File("file1", 10240),
+                File("file2", 10240),
+            ],
+        ),
+        File("nested1/out-of-order", 1024),
+        # Yep, again
+        Dir("nested1/somedir", []),
+    ],
+)
@@ -1,10 +1,10 @@
 """ Test the --compress """
 import os
-import time
 import pytest
-import tarfile
+import shutil
 import subprocess
-from tests.test_dirs import DIRS
+import sys
+from tests.helpers import input_tar, ls
 
 
 @pytest.fixture
@@ -25,15 +25,26 @@ def bin(tmpdir, monkeypatch):
 def exclusive_compress(bin):
     return bin(
         "locker",
-        """#!/usr/bin/env python
-import fcntl, os, sys
+        # Absolute interpreter path: no /usr/bin/env lookup on each launch.
+        f"#!{sys.executable}\n"
+        """import fcntl, os, shutil, sys
 
 lock_path = os.environ['X_SPLITAR_TEST_LOCK']
+ready_fd = os.environ.get('X_SPLITAR_TEST_READY_FD')
 with open(lock_path, 'w') as lock_file:
-    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
-    # Now copy stdin to stdout as noop filter.
-    # Can eat all memory...
-    sys.stdout.write(sys.stdin.read())
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        locked = True
+    except BlockingIOError:
+        locked = False
+    # Tell the test we are past the lock attempt.
+    if ready_fd is not None:
+        os.write(int(ready_fd), b'L' if locked else b'F')
+        os.close(int(ready_fd))
+    if not locked:
+        sys.exit(1)
+    # Now copy stdin to stdout as noop filter, in bounded chunks.
+    shutil.copyfileobj(sys.stdin.buffer, sys.stdout.buffer, 1 << 16)
 """,
     )
 
@@ -43,7 +54,11 @@ def test_exclusive_compress_is_sane(exclusive_compress, tmpdir, monkeypatch):
     lock.write("")
     monkeypatch.setenv("X_SPLITAR_TEST_LOCK", str(lock))
     ret = subprocess.run(
-        str(exclusive_compress), check=True, input=b"hi", capture_output=True
+        [str(exclusive_compress)],
+        check=True,
+        input=b"hi",
+        capture_output=True,
+        close_fds=False,
     )
     assert ret.stdout == b"hi"
 
@@ -52,26 +67,40 @@ def test_exclusive_compress_is_exclusive(exclusive_compress, tmpdir, monkeypatch
     lock = tmpdir.join("file.lock")
     lock.write("")
     monkeypatch.setenv("X_SPLITAR_TEST_LOCK", str(lock))
-    proc1 = subprocess.Popen([str(exclusive_compress)], stdin=subprocess.PIPE)
-    proc2 = subprocess.Popen([str(exclusive_compress)], stdin=subprocess.PIPE)
-    time.sleep(0.1)
+
+    def spawn():
+        ready_r, ready_w = os.pipe()
+        proc = subprocess.Popen(
+            [str(exclusive_compress)],
+            stdin=subprocess.PIPE,
+            pass_fds=(ready_w,),
+            env=dict(os.environ, X_SPLITAR_TEST_READY_FD=str(ready_w)),
+        )
+        os.close(ready_w)
+        return proc, ready_r
+
+    proc1, ready1 = spawn()
+    proc2, ready2 = spawn()
+    # Wait until both procs have tried to take the lock.
+    states = sorted([os.read(ready1, 1), os.read(ready2, 1)])
+    os.close(ready1)
+    os.close(ready2)
+    assert states == [b"F", b"L"]
     # Both procs are waitng for the input... Except one who has no l(o|u)ck!
-    proc2.communicate()
-    proc1.communicate()
+    # Close both stdins first so that the procs shut down concurrently.
+    proc1.stdin.close()
+    proc2.stdin.close()
+    proc1.wait()
+    proc2.wait()
     assert proc1.returncode != 0 or proc2.returncode != 0
     assert proc1.returncode == 0 or proc2.returncode == 0
 
 
-def test_basic(cargo_run, tmpdir):
-    import gzip
-
+def test_basic(cargo_run, tmpdir, dirs_tar_file):
     outdir = tmpdir.mkdir("out")
     output = outdir.join("output.tar.")
-    inp = tmpdir.join("input.tar")
+    inp = input_tar(tmpdir, dirs_tar_file)
 
-    with tarfile.open(str(inp), mode="w") as tar:
-        for obj in DIRS.get_children(""):
-            obj.add_to_tar(tar)
     # Test with gzip
     cargo_run(
         [
@@ -84,23 +113,21 @@ def test_basic(cargo_run, tmpdir):
             str(output),
         ]
     )
-    files = sorted(os.listdir(str(outdir)))
+    files = ls(outdir)
     assert files == ["output.tar.00000", "output.tar.00001"]
 
-    for file in files:
-        with open(str(outdir.join(file)), "rb") as f:
-            with gzip.open(f, "rb") as g:
-                g.read()
+    # Check integrity of all the parts at once with a native decoder.
+    decoder = shutil.which("pigz") or "gzip"
+    subprocess.run(
+        [decoder, "-t"] + [str(outdir.join(file)) for file in files], check=True
+    )
 
 
-def test_failure(cargo_run, tmpdir):
+def test_failure(cargo_run, tmpdir, dirs_tar_file):
     outdir = tmpdir.mkdir("out")
     output = outdir.join("output.tar.")
-    inp = tmpdir.join("input.tar")
+    inp = input_tar(tmpdir, dirs_tar_file)
 
-    with tarfile.open(str(inp), mode="w") as tar:
-        for obj in DIRS.get_children(""):
-            obj.add_to_tar(tar)
     with pytest.raises(subprocess.CalledProcessError):
         cargo_run(
             [
@@ -113,21 +140,18 @@ def test_failure(cargo_run, tmpdir):
                 str(output),
             ]
         )
-    assert os.listdir(str(outdir)) == []
+    assert ls(outdir) == []
 
 
-def test_completion(cargo_run, tmpdir, exclusive_compress, monkeypatch):
+def test_completion(cargo_run, tmpdir, exclusive_compress, monkeypatch, dirs_tar_file):
     lock = tmpdir.join("file.lock")
     lock.write("")
     monkeypatch.setenv("X_SPLITAR_TEST_LOCK", str(lock))
     # Test that subprocess is completed
     outdir = tmpdir.mkdir("out")
     output = outdir.join("output.tar.")
-    inp = tmpdir.join("input.tar")
+    inp = input_tar(tmpdir, dirs_tar_file)
 
-    with tarfile.open(str(inp), mode="w") as tar:
-        for obj in DIRS.get_children(""):
-            obj.add_to_tar(tar)
     # The exclusive_compress fails when two instances are launched.
     cargo_run(
         [
@@ -1,19 +1,25 @@
-import io
 import os
 import pytest
 import tarfile
+from tests.helpers import RepeatReader, input_tar, ls, write_tar
 
 
-def tarinfo(name, type, linkname=None, data=None):
+def tarinfo(name, type, linkname=None, size=None):
     ti = tarfile.TarInfo(name)
     ti.type = type
     if linkname is not None:
         ti.linkname = linkname
-    if data is not None:
-        ti.size = len(data)
+    if size is not None:
+        ti.size = size
     return ti
 
 
+def empty_tar(path):
+    # Two zero blocks, i.e. an empty archive; a sparse file is enough.
+    with open(str(path), "wb") as f:
+        os.ftruncate(f.fileno(), 1024)
+
+
 def test_is_sane(cargo_run):
     """Check that cargo run runs, otherwise all tests will fail"""
     cargo_run(["--help"])
@@ -23,11 +29,11 @@ def test_empty(cargo_run, tmpdir):
     outdir = tmpdir.mkdir("out")
     output = outdir.join("output.tar.")
     inp = tmpdir.join("input.tar")
-    inp.write(b"\x00" * 1024)
+    empty_tar(inp)
 
     cargo_run(["-S", "100K", str(inp), str(output)])
 
-    assert os.listdir(str(outdir)) == ["output.tar.00000"]
+    assert ls(outdir) == ["output.tar.00000"]
     assert outdir.join("output.tar.00000").read_binary() == (b"\x00" * 1024)
 
 
@@ -35,11 +41,11 @@ def test_suffix(cargo_run, tmpdir):
     outdir = tmpdir.mkdir("out")
     output = outdir.join("output.tar.")
     inp = tmpdir.join("input.tar")
-    inp.write(b"\x00" * 1024)
+    empty_tar(inp)
 
     cargo_run(["-S", "100K", "--suffix-length", "8", str(inp), str(output)])
 
-    assert os.listdir(str(outdir)) == ["output.tar.00000000"]
+    assert ls(outdir) == ["output.tar.00000000"]
 
 
 @pytest.mark.parametrize(
@@ -64,14 +70,28 @@ def test_tar_type(cargo_run, tmpdir, tartype, linkname, contents):
         if contents is None:
             tar.addfile(tarinfo("theobject", tartype, linkname=linkname))
         else:
-            data = b"1234" * contents
+            size = 4 * contents
             tar.addfile(
-                tarinfo("theobject", tartype, data=data),
-                io.BytesIO(data),
+                tarinfo("theobject", tartype, size=size),
+                RepeatReader(b"1234", size),
             )
 
     cargo_run(["-S", "100K", str(inp), str(output)])
-    assert os.listdir(str(outdir)) == ["output.tar.00000"]
+    assert ls(outdir) == ["output.tar.00000"]
+
+
+def big_splits_entries():
+    for i in range(10):
+        size = 4 * 1024 * i
+        yield (
+            tarinfo("theobject" + str(i), tarfile.REGTYPE, size=size),
+            RepeatReader(b"1234", size),
+        )
+
+
+@pytest.fixture(scope="session")
+def big_splits_tar_file(shared_dir):
+    return write_tar(shared_dir / "big_splits.tar", big_splits_entries())
 
 
 @pytest.mark.parametrize(
@@ -91,73 +111,63 @@ def test_tar_type(cargo_run, tmpdir, tartype, linkname, contents):
         ("80K", ["output.tar.00000", "output.tar.00001", "output.tar.00002"]),
     ],
 )
-def test_splits(cargo_run, tmpdir, size, expected):
+def test_splits(cargo_run, tmpdir, big_splits_tar_file, size, expected):
     outdir = tmpdir.mkdir("out")
     output = outdir.join("output.tar.")
-    inp = tmpdir.join("input.tar")
-
-    with tarfile.open(str(inp), mode="w") as tar:
-        for i in range(10):
-            data = b"1234" * (1024 * i)
-            tar.addfile(
-                tarinfo("theobject" + str(i), tarfile.REGTYPE, data=data),
-                io.BytesIO(data),
-            )
+    inp = input_tar(tmpdir, big_splits_tar_file)
 
     cargo_run(["-S", size, str(inp), str(output)])
-    assert sorted(os.listdir(str(outdir))) == expected
+    assert ls(outdir) == expected
 
 
-def test_file_too_large(cargo_run, tmpdir):
+def test_file_too_large(cargo_run, tmpdir, big_splits_tar_file):
     outdir = tmpdir.mkdir("out")
     output = outdir.join("output.tar.")
-    inp = tmpdir.join("input.tar")
-
-    with tarfile.open(str(inp), mode="w") as tar:
-        for i in range(10):
-            data = b"1234" * (1024 * i)
-            tar.addfile(
-                tarinfo("theobject" + str(i), tarfile.REGTYPE, data=data),
-                io.BytesIO(data),
-            )
+    inp = input_tar(tmpdir, big_splits_tar_file)
 
     with pytest.raises(Exception):
         cargo_run(["-S", "20K", "--fail-on-large-file", str(inp), str(output)])
-    assert sorted(os.listdir(str(outdir))) == [
+    assert ls(outdir) == [
         "output.tar.00000",
         "output.tar.00001",
     ]
 
 
-def test_verbose(cargo_run, tmpdir, monkeypatch):
+def verbose_entries():
+    for i, (tartype, linkname, contents) in enumerate(
+        [
+            (tarfile.DIRTYPE, None, None),
+            (tarfile.REGTYPE, None, 1),
+            (tarfile.REGTYPE, None, 1024),
+            (tarfile.AREGTYPE, None, 1),
+            (tarfile.AREGTYPE, None, 1024),
+            (tarfile.LNKTYPE, "otherhard", None),
+            (tarfile.SYMTYPE, "othersym", None),
+            (tarfile.FIFOTYPE, None, None),
+        ]
+    ):
+        if contents is None:
+            yield tarinfo("theobject" + str(i), tartype, linkname=linkname), None
+        else:
+            size = 4 * contents
+            yield (
+                tarinfo("theobject" + str(i), tartype, size=size),
+                RepeatReader(b"1234", size),
+            )
+
+
+@pytest.fixture(scope="session")
+def verbose_tar_file(shared_dir):
+    return write_tar(shared_dir / "verbose.tar", verbose_entries())
+
+
+def test_verbose(cargo_run, tmpdir, monkeypatch, verbose_tar_file):
     monkeypatch.setenv("TZ", "GMT-1")
     outdir = tmpdir.mkdir("out")
     output = outdir.join("output.tar.")
-    inp = tmpdir.join("input.tar")
+    inp = input_tar(tmpdir, verbose_tar_file)
 
-    with tarfile.open(str(inp), mode="w") as tar:
-        for i, (tartype, linkname, contents) in enumerate(
-            [
-                (tarfile.DIRTYPE, None, None),
-                (tarfile.REGTYPE, None, 1),
-                (tarfile.REGTYPE, None, 1024),
-                (tarfile.AREGTYPE, None, 1),
-                (tarfile.AREGTYPE, None, 1024),
-                (tarfile.LNKTYPE, "otherhard", None),
-                (tarfile.SYMTYPE, "othersym", None),
-                (tarfile.FIFOTYPE, None, None),
-            ]
-        ):
-            if contents is None:
-                tar.addfile(tarinfo("theobject" + str(i), tartype, linkname=linkname))
-            else:
-                data = b"1234" * contents
-                tar.addfile(
-                    tarinfo("theobject" + str(i), tartype, data=data),
-                    io.BytesIO(data),
-                )
-
-    res = cargo_run(["-S", "10K", "-v", str(inp), str(output)])
+    res = cargo_run(["-S", "10K", "-v", str(inp), str(output)], capture=True)
     assert not res.stdout, repr(res.stdout)
     assert res.stderr == (
         b"""00000 drw-r--r--              0 1970-01-01 01:00:00 theobject0/